@@ -1,24 +1,92 @@
 #!/usr/bin/env python3
 """
-GitHub Folder Downloader - Git Sparse-Checkout Method
-Downloads a GitHub repository folder using git sparse-checkout for efficiency.
-Usage: python github_downloader.py <github_url> [output_folder]
+GitHub Folder Downloader
+Downloads a GitHub repository folder with the cheapest method for its size:
+raw files over HTTP/2, a codeload tarball, or git sparse-checkout.
+Usage: python ghfd.py [-o output_folder] <github_url> [github_url ...] [output_folder]
 """
 
 import os
+import re
 import sys
+import errno
 import argparse
+import asyncio
 import subprocess
 import shutil
 import tempfile
-from urllib.parse import urlparse
+import uuid
+import tarfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, FIRST_EXCEPTION, wait
+import urllib.error
+import urllib.request
+from urllib.parse import quote, unquote, urlparse
 from pathlib import Path
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows: mirrors are only locked within one process
+
+_SHA1_RE = re.compile(r'^[0-9a-fA-F]{40}$')
+
+# Git output is never read on success; only stderr is kept for error reports
+_RUN_KWARGS = dict(stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+
+# Download strategies, cheapest first for small amounts of data
+RAW, TARBALL, SPARSE, CACHED = "raw", "tarball", "sparse", "cached"
+
+# Largest codeload archive (in bytes) each strategy is picked for; bigger
+# repositories go through a sparse clone
+_STRATEGY_THRESHOLDS = {
+    RAW: 1 * 1024 * 1024,
+    TARBALL: 50 * 1024 * 1024,
+}
+
+# Beyond this many files one tarball beats one GET per file
+_API_MAX_FILES = 100
+# Leave some unauthenticated API quota (60/hour) for other tools
+_API_MIN_RATE_LIMIT = 10
+
+_MIRROR_LOCKS = {}
+_MIRROR_LOCKS_GUARD = threading.Lock()
+
+@contextmanager
+def mirror_lock(cache_dir):
+    """Serialize worktree bookkeeping in a cached mirror across threads and processes"""
+    with _MIRROR_LOCKS_GUARD:
+        lock = _MIRROR_LOCKS.setdefault(str(cache_dir), threading.Lock())
+    with lock, open(f"{cache_dir}.lock", "w") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
 class GitHubFolderDownloader:
-    def __init__(self, github_url, output_dir):
+    # Last X-RateLimit-Remaining seen from the GitHub API, None until known
+    api_remaining = None
+    
+    def __init__(self, github_url, output_dir, protocol="https", use_cache=False):
         self.github_url = github_url.rstrip('/')
         self.output_dir = Path(output_dir).expanduser()
+        self.protocol = protocol
+        self.use_cache = use_cache
         
+    @staticmethod
+    def classify_ref(git_ref):
+        """Determine if a git reference is a commit hash, tag, or branch"""
+        if _SHA1_RE.match(git_ref):
+            return "commit"
+        if '.' in git_ref or git_ref.startswith('v'):
+            return "tag"  # Common tag patterns
+        return "branch"
+    
     def parse_github_url(self):
         """Parse GitHub URL to extract repo info, git reference, and folder path"""
         parsed = urlparse(self.github_url)
@@ -34,35 +102,23 @@ class GitHubFolderDownloader:
         folder_path = ""
         git_ref = "main"  # default branch
         ref_type = "branch"  # can be 'branch', 'commit', or 'tag'
+        url_type = "tree"  # 'blob' when the URL points at a single file
         
         if len(path_parts) > 2:
             if path_parts[2] == "tree" and len(path_parts) > 3:
                 git_ref = path_parts[3]
                 if len(path_parts) > 4:
                     folder_path = "/".join(path_parts[4:])
-                
-                # Determine if it's a commit hash, tag, or branch
-                if len(git_ref) == 40 and all(c in '0123456789abcdef' for c in git_ref.lower()):
-                    ref_type = "commit"
-                elif '.' in git_ref or git_ref.startswith('v'):
-                    ref_type = "tag"  # Common tag patterns
-                else:
-                    ref_type = "branch"
+                ref_type = self.classify_ref(git_ref)
                     
             elif path_parts[2] == "blob" and len(path_parts) > 3:
+                url_type = "blob"
                 git_ref = path_parts[3]
                 if len(path_parts) > 4:
                     folder_path = "/".join(path_parts[4:])
-                
-                # Same logic for blob URLs
-                if len(git_ref) == 40 and all(c in '0123456789abcdef' for c in git_ref.lower()):
-                    ref_type = "commit"
-                elif '.' in git_ref or git_ref.startswith('v'):
-                    ref_type = "tag"
-                else:
-                    ref_type = "branch"
+                ref_type = self.classify_ref(git_ref)
         
-        return owner, repo, git_ref, ref_type, folder_path
+        return owner, repo, git_ref, ref_type, folder_path, url_type
     
     def check_git_available(self):
         """Check if git is available in the system"""
@@ -76,18 +132,498 @@ class GitHubFolderDownloader:
             print("Please install Git: https://git-scm.com/downloads")
             return False
     
+    def get_target_path(self, repo, git_ref, ref_type, folder_path, is_file=False):
+        """Build the destination path, tagging the name with the git reference"""
+        base_name = Path(folder_path).name if folder_path else repo
+        
+        if ref_type == "commit":
+            ref_suffix = f"_{git_ref[:8]}"
+        elif ref_type == "tag":
+            ref_suffix = f"_{git_ref.replace('/', '_')}"
+        else:
+            ref_suffix = f"_{git_ref}" if git_ref != "main" else ""
+        
+        if is_file:
+            # Keep the extension last so the file still opens with its usual tool
+            name = Path(base_name)
+            return self.output_dir / f"{name.stem}{ref_suffix}{name.suffix}"
+        return self.output_dir / f"{base_name}{ref_suffix}"
+    
+    def show_stats(self, target_path, git_ref, ref_type):
+        """Print a summary of the downloaded tree"""
+        # One os.walk gets file types from scandir, no extra stat per entry
+        total_files = total_dirs = 0
+        for _, dirs, files in os.walk(target_path):
+            total_dirs += len(dirs)
+            total_files += len(files)
+        
+        print(f"\nDownload completed!")
+        print(f"Directories: {total_dirs}")
+        print(f"Files: {total_files}")
+        print(f"Location: {target_path.absolute()}")
+        print(f"Git reference: {git_ref} ({ref_type})")
+    
+    @staticmethod
+    def copy_tree_parallel(source, target):
+        """
+        Recreate a directory tree, copying files on a thread pool
+        
+        Directories and symlinks are created in walk order; file copies are
+        I/O bound and release the GIL, so running them concurrently keeps
+        several reads and writes in flight (shutil already uses sendfile
+        on Linux for each of them).
+        """
+        jobs = []
+        with ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 2) as executor:
+            for root, dirs, files in os.walk(source):
+                dest_root = os.path.join(target, os.path.relpath(root, source))
+                os.makedirs(dest_root, exist_ok=True)
+                
+                # os.walk lists symlinks to directories in dirs without
+                # descending, so those have to be recreated here
+                for name in dirs:
+                    src = os.path.join(root, name)
+                    if os.path.islink(src):
+                        os.symlink(os.readlink(src), os.path.join(dest_root, name))
+                
+                for name in files:
+                    src = os.path.join(root, name)
+                    dst = os.path.join(dest_root, name)
+                    if os.path.islink(src):
+                        os.symlink(os.readlink(src), dst)
+                    else:
+                        jobs.append(executor.submit(shutil.copy2, src, dst))
+            
+            done, pending = wait(jobs, return_when=FIRST_EXCEPTION)
+            for job in pending:
+                job.cancel()
+            for job in done:
+                job.result()
+    
+    @classmethod
+    def move_tree(cls, source, target, is_dir=None):
+        """Move a file or directory, copying only when crossing filesystems"""
+        try:
+            os.rename(source, target)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            if is_dir is None:
+                is_dir = os.path.isdir(source) and not os.path.islink(source)
+            # Hardlinks can't cross filesystems either, so copy the data
+            if is_dir:
+                cls.copy_tree_parallel(source, target)
+            else:
+                shutil.copy2(source, target, follow_symlinks=False)
+    
+    def get_clone_url(self, owner, repo):
+        """Build the git remote URL for the selected --protocol"""
+        if self.protocol == "ssh":
+            return f"git@github.com:{owner}/{repo}.git"
+        return f"https://github.com/{owner}/{repo}.git"
+    
+    def download_raw(self):
+        """
+        Download a single file from raw.githubusercontent.com
+        
+        Blob URLs need no repository data at all, one HTTPS GET is enough.
+        """
+        owner, repo, git_ref, ref_type, file_path, _ = self.parse_github_url()
+        raw_url = f"https://raw.githubusercontent.com/{owner}/{repo}/{git_ref}/{file_path}"
+        target_path = self.get_target_path(repo, git_ref, ref_type, file_path, is_file=True)
+        # Write next to the target and swap it in only once the body is
+        # complete, so a failed fetch never touches an existing copy
+        temp_path = self.output_dir / f".ghfd-{uuid.uuid4().hex}-{target_path.name}"
+        
+        print(f"Repository: {owner}/{repo}")
+        print(f"Git reference: {git_ref} ({ref_type})")
+        print(f"Target file: {file_path}")
+        print(f"Raw URL: {raw_url}")
+        print()
+        
+        try:
+            with urllib.request.urlopen(raw_url) as resp, open(temp_path, 'xb') as f:
+                shutil.copyfileobj(resp, f)
+            os.replace(temp_path, target_path)
+            
+            print(f"✓ Successfully downloaded to: {target_path}")
+            print(f"\nDownload completed!")
+            print(f"Size: {target_path.stat().st_size} bytes")
+            print(f"Location: {target_path.absolute()}")
+            print(f"Git reference: {git_ref} ({ref_type})")
+            return True
+            
+        except OSError as e:
+            # URLError is an OSError too, as are write failures
+            print(f"\nRaw download failed: {e}")
+            temp_path.unlink(missing_ok=True)
+            return False
+    
+    async def list_api_files(self, client, owner, repo, git_ref, folder_path):
+        """List every file below folder_path with a single recursive Trees API call"""
+        resp = await client.get(f"https://api.github.com/repos/{owner}/{repo}/git/trees/{git_ref}",
+                                params={"recursive": "1"})
+        
+        # Remember the quota for later downloads in this run, before checking
+        # the status: a 403 here is usually the limit itself
+        remaining = resp.headers.get("X-RateLimit-Remaining")
+        if remaining is not None:
+            GitHubFolderDownloader.api_remaining = int(remaining)
+        resp.raise_for_status()
+        
+        listing = resp.json()
+        if listing.get("truncated"):
+            raise RuntimeError("repository tree too large for one listing")
+        
+        prefix = unquote(folder_path).strip('/') + "/"
+        files = [entry for entry in listing["tree"]
+                 if entry["type"] == "blob" and entry["path"].startswith(prefix)]
+        
+        if len(files) > _API_MAX_FILES:
+            raise RuntimeError(f"more than {_API_MAX_FILES} files")
+        return prefix, files
+    
+    async def fetch_api_files(self, owner, repo, git_ref, folder_path, target_path):
+        """List a folder, then fetch all of its files concurrently over HTTP/2"""
+        # One connection per host (api and raw), requests are multiplexed on it
+        async with httpx.AsyncClient(http2=True, follow_redirects=True, timeout=30,
+                                     limits=httpx.Limits(max_connections=2)) as client:
+            prefix, files = await self.list_api_files(client, owner, repo, git_ref, folder_path)
+            if not files:
+                raise FileNotFoundError(f"Folder '{folder_path}' is empty or not found")
+            
+            print(f"Fetching {len(files)} files...")
+            if target_path.exists():
+                print(f"Removing existing directory: {target_path}")
+                shutil.rmtree(target_path)
+            
+            async def fetch(entry):
+                # Raw downloads don't count against the API rate limit
+                resp = await client.get(f"https://raw.githubusercontent.com/{owner}/{repo}/"
+                                        f"{git_ref}/{quote(entry['path'])}")
+                resp.raise_for_status()
+                dest = target_path / entry["path"][len(prefix):]
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                if entry["mode"] == "120000":
+                    os.symlink(resp.text, dest)
+                else:
+                    dest.write_bytes(resp.content)
+            
+            await asyncio.gather(*(fetch(entry) for entry in files))
+    
+    def download_with_api(self):
+        """
+        Download a small folder file by file from raw.githubusercontent.com
+        
+        The folder is listed with one recursive Trees API call, then every
+        file is requested at once over a single multiplexed HTTP/2
+        connection. For a few dozen small files this beats generating and
+        streaming a tarball of the whole repository. Requires the optional
+        httpx[http2] package; large folders and a low API rate limit defer
+        to the tarball.
+        """
+        if httpx is None:
+            return False
+        
+        # Checked before spending a request; the quota is shared by all
+        # downloads of a batch
+        remaining = GitHubFolderDownloader.api_remaining
+        if remaining is not None and remaining < _API_MIN_RATE_LIMIT:
+            print(f"Skipping API download: rate limit nearly exhausted ({remaining} left)")
+            return False
+        
+        owner, repo, git_ref, ref_type, folder_path, _ = self.parse_github_url()
+        target_path = self.get_target_path(repo, git_ref, ref_type, folder_path)
+        
+        print(f"Repository: {owner}/{repo}")
+        print(f"Git reference: {git_ref} ({ref_type})")
+        print(f"Target folder: {folder_path}")
+        print("Source: GitHub Trees API + raw.githubusercontent.com (HTTP/2)")
+        print()
+        
+        try:
+            asyncio.run(self.fetch_api_files(owner, repo, git_ref, folder_path, target_path))
+            
+            print(f"✓ Successfully downloaded to: {target_path}")
+            self.show_stats(target_path, git_ref, ref_type)
+            return True
+            
+        except RuntimeError as e:
+            print(f"Skipping API download: {e}")
+            return False
+            
+        except (httpx.HTTPError, ImportError, OSError) as e:
+            print(f"\nAPI download failed: {e}")
+            return False
+    
+    def download_with_pipe(self):
+        """
+        Download by piping `git archive --remote` straight into `tar -x`
+        
+        Nothing is stored on disk but the extracted files. Only servers that
+        allow git-upload-archive accept this. github.com currently refuses
+        it over both HTTPS and SSH, so it is only tried with --protocol=ssh
+        and a refusal falls back to the other strategies.
+        """
+        owner, repo, git_ref, ref_type, folder_path, _ = self.parse_github_url()
+        clone_url = self.get_clone_url(owner, repo)
+        target_path = self.get_target_path(repo, git_ref, ref_type, folder_path)
+        
+        print(f"Repository: {owner}/{repo}")
+        print(f"Git reference: {git_ref} ({ref_type})")
+        print(f"Target folder: {folder_path if folder_path else '(entire repository)'}")
+        print(f"Archive remote: {clone_url}")
+        print()
+        
+        archive_cmd = ["git", "archive", "--remote", clone_url, "--format=tar", git_ref]
+        if folder_path:
+            archive_cmd.append(folder_path)
+        strip = len(Path(folder_path).parts) if folder_path else 0
+        
+        # Extract next to the target and swap it in only once both processes
+        # succeeded, so a refused archive leaves an existing copy intact
+        with tempfile.TemporaryDirectory(prefix=".ghfd-", dir=self.output_dir) as temp_dir:
+            staging_path = Path(temp_dir) / target_path.name
+            tar_cmd = ["tar", "-x", "-C", str(staging_path), f"--strip-components={strip}"]
+            
+            try:
+                staging_path.mkdir()
+                
+                print("Streaming git archive...")
+                archive = subprocess.Popen(archive_cmd, stdout=subprocess.PIPE,
+                                           stderr=subprocess.PIPE)
+                try:
+                    tar = subprocess.Popen(tar_cmd, stdin=archive.stdout,
+                                           stderr=subprocess.PIPE)
+                except OSError:
+                    archive.kill()
+                    archive.communicate()
+                    raise
+                # Only tar may hold the read end, so git gets SIGPIPE if tar dies
+                archive.stdout.close()
+                _, tar_err = tar.communicate()
+                _, archive_err = archive.communicate()
+                
+                if archive.returncode:
+                    raise subprocess.CalledProcessError(archive.returncode, archive_cmd,
+                                                        stderr=archive_err.decode(errors="replace"))
+                if tar.returncode:
+                    raise subprocess.CalledProcessError(tar.returncode, tar_cmd,
+                                                        stderr=tar_err.decode(errors="replace"))
+                
+                if target_path.exists():
+                    print(f"Removing existing directory: {target_path}")
+                    shutil.rmtree(target_path)
+                self.move_tree(staging_path, target_path, is_dir=True)
+                
+                print(f"✓ Successfully extracted to: {target_path}")
+                self.show_stats(target_path, git_ref, ref_type)
+                return True
+                
+            except subprocess.CalledProcessError as e:
+                print(f"\nGit command failed:")
+                print(f"Command: {' '.join(e.cmd)}")
+                if e.stderr:
+                    print(f"Error: {e.stderr}")
+                return False
+                
+            except OSError as e:
+                print(f"\n{e}")
+                return False
+    
+    def download_with_archive(self):
+        """
+        Download using the codeload tarball of a git reference
+        
+        The archive is streamed straight from the HTTP response through
+        tarfile, and only members below the requested folder are extracted.
+        No .git database, working tree or intermediate copy is created.
+        """
+        owner, repo, git_ref, ref_type, folder_path, _ = self.parse_github_url()
+        archive_url = f"https://codeload.github.com/{owner}/{repo}/tar.gz/{git_ref}"
+        target_path = self.get_target_path(repo, git_ref, ref_type, folder_path)
+        
+        print(f"Repository: {owner}/{repo}")
+        print(f"Git reference: {git_ref} ({ref_type})")
+        print(f"Target folder: {folder_path if folder_path else '(entire repository)'}")
+        print(f"Archive URL: {archive_url}")
+        print()
+        
+        # Members are named '<repo>-<ref>/<path>'; GitHub mangles the ref in
+        # the top-level directory (e.g. strips a leading 'v'), so the first
+        # component is dropped instead of being rebuilt from git_ref
+        prefix = f"{folder_path}/" if folder_path else ""
+        extract_kwargs = {"filter": "tar"} if hasattr(tarfile, "tar_filter") else {}
+        
+        # Extract next to the target and swap it in only once the archive
+        # is complete, so a failed download leaves an existing copy intact
+        with tempfile.TemporaryDirectory(prefix=".ghfd-", dir=self.output_dir) as temp_dir:
+            staging_path = Path(temp_dir) / target_path.name
+            
+            try:
+                print("Streaming archive...")
+                extracted = 0
+                with urllib.request.urlopen(archive_url) as resp, \
+                        tarfile.open(fileobj=resp, mode="r|gz") as tf:
+                    for member in tf:
+                        _, _, name = member.name.partition('/')
+                        if not name.startswith(prefix) or name == prefix:
+                            continue
+                        member.name = name[len(prefix):]
+                        tf.extract(member, staging_path, **extract_kwargs)
+                        extracted += 1
+                
+                if not extracted:
+                    raise FileNotFoundError(f"Folder '{folder_path}' not found in {ref_type} '{git_ref}'")
+                
+                if target_path.exists():
+                    print(f"Removing existing directory: {target_path}")
+                    shutil.rmtree(target_path)
+                self.move_tree(staging_path, target_path, is_dir=True)
+                
+                print(f"✓ Successfully extracted to: {target_path}")
+                self.show_stats(target_path, git_ref, ref_type)
+                return True
+                
+            except urllib.error.URLError as e:
+                print(f"\nArchive download failed: {e}")
+                return False
+                
+            except (tarfile.TarError, OSError) as e:
+                print(f"\n{e}")
+                return False
+    
+    @staticmethod
+    def sparse_checkout_file(repo_path):
+        """Locate the sparse-checkout file without spawning git"""
+        git_dir = repo_path / ".git"
+        if git_dir.is_file():
+            # Linked worktrees have a 'gitdir: <path>' file instead
+            git_dir = Path(git_dir.read_text().partition(":")[2].strip())
+        return git_dir / "info" / "sparse-checkout"
+    
+    def configure_sparse_checkout(self, repo_path, folder_path):
+        """Restrict the working tree of repo_path to folder_path"""
+        if folder_path and not any(c in folder_path for c in "*?[\\"):
+            # Plain directory: cone mode matches by directory prefix
+            # instead of testing every pattern against every path
+            sparse_args = ["--cone", folder_path]
+            patterns = None
+            print(f"✓ Configured to download folder: {folder_path} (cone mode)")
+            
+            # What git writes for a cone: every parent directory's files,
+            # then the folder itself recursively
+            parts = folder_path.strip('/').split('/')
+            expected = ["/*", "!/*/"]
+            for i in range(1, len(parts)):
+                parent = "/" + "/".join(parts[:i]) + "/"
+                expected += [parent, f"!{parent}*/"]
+            expected.append("/" + "/".join(parts) + "/")
+        elif folder_path:
+            # Download specific folder and its contents
+            sparse_args = ["--no-cone", "--stdin"]
+            patterns = [
+                f"{folder_path}",      # Include the folder itself
+                f"{folder_path}/**"    # Include everything inside recursively
+            ]
+            print(f"✓ Configured to download folder: {folder_path}")
+        else:
+            # Download everything (root level)
+            sparse_args = ["--no-cone", "--stdin"]
+            patterns = ["*"]
+            print("✓ Configured to download entire repository")
+        
+        if patterns:
+            expected = patterns
+        
+        # Rewriting identical patterns would still make git rescan the tree,
+        # which matters when a checkout is reused
+        sparse_file = self.sparse_checkout_file(repo_path)
+        new_content = ("\n".join(expected) + "\n").encode()
+        if sparse_file.exists() and sparse_file.read_bytes() == new_content:
+            print("✓ Sparse-checkout patterns already up to date")
+            return
+        
+        # 'set' enables core.sparseCheckout (only for this repository)
+        # and writes the patterns file in the same git invocation;
+        # patterns go through stdin as one joined write
+        subprocess.run([
+            "git", "-C", str(repo_path),
+            "sparse-checkout", "set", *sparse_args
+        ], input=("\n".join(patterns) + "\n") if patterns else None,
+           **_RUN_KWARGS)
+        print("✓ Sparse-checkout patterns set (local repository only)")
+    
+    def install_checkout(self, repo_path, repo, git_ref, ref_type, folder_path):
+        """Move the checked-out content into the output directory"""
+        # Determine source and target paths
+        if folder_path:
+            source_folder = repo_path / folder_path
+            if not source_folder.exists():
+                raise FileNotFoundError(f"Folder '{folder_path}' not found in {ref_type} '{git_ref}'")
+            
+            # Include git reference in folder name for clarity
+            target_path = self.get_target_path(repo, git_ref, ref_type, folder_path)
+            
+            print(f"Source: {source_folder}")
+            print(f"Target: {target_path}")
+            
+            # Remove existing target directory if it exists
+            if target_path.exists():
+                print(f"Removing existing directory: {target_path}")
+                shutil.rmtree(target_path)
+            
+            # Move the folder
+            self.move_tree(source_folder, target_path)
+            
+        else:
+            # Move entire repository (excluding .git)
+            target_path = self.get_target_path(repo, git_ref, ref_type, folder_path)
+            
+            print(f"Source: {repo_path} (excluding .git)")
+            print(f"Target: {target_path}")
+            
+            # Remove existing target directory if it exists
+            if target_path.exists():
+                print(f"Removing existing directory: {target_path}")
+                shutil.rmtree(target_path)
+            
+            # Create target directory
+            target_path.mkdir(parents=True, exist_ok=True)
+            
+            # Move everything except .git directory; scandir already knows
+            # each entry's type, so no stat is needed per item
+            with os.scandir(repo_path) as entries:
+                for entry in entries:
+                    if entry.name != '.git':
+                        self.move_tree(entry.path, target_path / entry.name,
+                                       is_dir=entry.is_dir(follow_symlinks=False))
+        
+        return target_path
+    
     def download_with_sparse_checkout(self):
         """
         Download using git sparse-checkout method
         
         This method works by:
-        1. Cloning the repository without checking out files (--no-checkout)
-        2. Enabling sparse-checkout feature
-        3. Specifying which folders/files to include
-        4. Checking out only the specified content at the specified git reference
+        1. Shallow-cloning the repository, or fetching just the commit for SHAs,
+           without checking out files
+        2. Enabling sparse-checkout with the folders/files to include
+        3. Checking out only the specified content at the specified git reference
+        
+        Everything is fetched at depth 1; the partial-clone filter depends on
+        what the checkout actually needs from that single commit:
+        
+            folder_path | filter
+            ------------+-----------
+            set         | blob:none  only the folder's blobs are fetched, lazily
+            (none)      | (none)     every tree and blob is needed anyway, a
+                        |            filter would only add lazy-fetch round trips
         """
-        owner, repo, git_ref, ref_type, folder_path = self.parse_github_url()
-        clone_url = f"https://github.com/{owner}/{repo}.git"
+        owner, repo, git_ref, ref_type, folder_path, _ = self.parse_github_url()
+        clone_url = self.get_clone_url(owner, repo)
+        
+        filter_spec = "blob:none" if folder_path else None
         
         print(f"Repository: {owner}/{repo}")
         print(f"Git reference: {git_ref} ({ref_type})")
@@ -95,159 +631,206 @@ class GitHubFolderDownloader:
         print(f"Clone URL: {clone_url}")
         print()
         
-        # Create temporary directory for the git operations
-        with tempfile.TemporaryDirectory() as temp_dir:
+        # Create temporary directory for the git operations next to the
+        # target, so the result can be renamed into place instead of copied
+        with tempfile.TemporaryDirectory(prefix=".ghfd-", dir=self.output_dir) as temp_dir:
             temp_path = Path(temp_dir)
             repo_path = temp_path / repo
             
             try:
-                print("Step 1: Cloning repository (without checkout)...")
+                if ref_type == "commit":
+                    # GitHub serves any reachable SHA directly, so fetching just
+                    # that commit avoids downloading the history before it
+                    print(f"Step 1: Fetching commit {git_ref[:8]} (without checkout)...")
+                    subprocess.run(["git", "init", str(repo_path)], **_RUN_KWARGS)
+                    subprocess.run([
+                        "git", "-C", str(repo_path),
+                        "remote", "add", "origin", clone_url
+                    ], **_RUN_KWARGS)
+                    
+                    fetch_cmd = [
+                        "git", "-C", str(repo_path),
+                        "fetch", "--depth", "1", "origin", git_ref
+                    ]
+                    if filter_spec:
+                        fetch_cmd.insert(-2, f"--filter={filter_spec}")
+                    
+                    subprocess.run(fetch_cmd, **_RUN_KWARGS)
+                    checkout_ref = "FETCH_HEAD"
+                    print("✓ Commit fetched successfully")
+                else:
+                    print("Step 1: Cloning repository (without checkout)...")
+                    
+                    clone_cmd = [
+                        "git", "clone", 
+                        "--no-checkout",           # Don't checkout files yet
+                        "--depth", "1",
+                        "--branch", git_ref,
+                        "--single-branch",         # Skip other branches
+                        "--no-tags",               # and all tags
+                        clone_url, 
+                        str(repo_path)
+                    ]
+                    
+                    # Don't download more objects than the checkout needs
+                    if filter_spec:
+                        clone_cmd.insert(-2, f"--filter={filter_spec}")
+                    
+                    subprocess.run(clone_cmd, **_RUN_KWARGS)
+                    checkout_ref = git_ref
+                    print("✓ Repository cloned successfully")
                 
-                # For commits, we need to fetch more history
-                clone_cmd = [
-                    "git", "clone", 
-                    "--no-checkout",           # Don't checkout files yet
-                    "--filter=blob:none",      # Don't download file contents yet
-                    clone_url, 
-                    str(repo_path)
-                ]
+                print("\nStep 2: Configuring sparse-checkout...")
+                self.configure_sparse_checkout(repo_path, folder_path)
                 
-                # For commits, we can't use --depth 1 as the commit might not be in recent history
-                if ref_type != "commit":
-                    clone_cmd.insert(-2, "--depth")
-                    clone_cmd.insert(-2, "1")
-                    clone_cmd.insert(-2, "--branch")
-                    clone_cmd.insert(-2, git_ref)
+                print(f"\nStep 3: Checking out files at {ref_type} '{git_ref}'...")
+                # Now checkout the files at the specific git reference
+                subprocess.run([
+                    "git", "-C", str(repo_path),
+                    "-c", "advice.detachedHead=false",
+                    "checkout", checkout_ref
+                ], **_RUN_KWARGS)
+                print(f"✓ Files checked out successfully at {git_ref}")
                 
-                subprocess.run(clone_cmd, check=True, capture_output=True, text=True)
-                print("✓ Repository cloned successfully")
+                print("\nStep 4: Moving to destination...")
+                target_path = self.install_checkout(repo_path, repo, git_ref, ref_type, folder_path)
                 
-                # For commits, we need to fetch the specific commit if it's not available
-                if ref_type == "commit":
-                    print(f"Step 1b: Fetching commit {git_ref[:8]}...")
-                    try:
-                        # Try to checkout the commit directly
-                        subprocess.run([
-                            "git", "-C", str(repo_path),
-                            "cat-file", "-e", git_ref
-                        ], check=True, capture_output=True, text=True)
-                        print("✓ Commit found in repository")
-                    except subprocess.CalledProcessError:
-                        # If commit not found, fetch more history
-                        print("Commit not in shallow history, fetching more...")
-                        subprocess.run([
-                            "git", "-C", str(repo_path),
-                            "fetch", "--unshallow"
-                        ], check=True, capture_output=True, text=True)
-                        print("✓ Full history fetched")
+                print(f"✓ Successfully moved to: {target_path}")
                 
-                print("\nStep 2: Configuring sparse-checkout...")
-                # Enable sparse-checkout feature (only for this repository)
-                subprocess.run([
-                    "git", "-C", str(repo_path), 
-                    "config", "--local", "core.sparseCheckout", "true"
-                ], check=True, capture_output=True, text=True)
-                print("✓ Sparse-checkout enabled (local repository only)")
+                # Show some stats
+                self.show_stats(target_path, git_ref, ref_type)
                 
-                # Configure what to include in sparse-checkout
-                sparse_file = repo_path / ".git" / "info" / "sparse-checkout"
+                return True
                 
-                if folder_path:
-                    # Download specific folder and its contents
-                    patterns = [
-                        f"{folder_path}",      # Include the folder itself
-                        f"{folder_path}/**"    # Include everything inside recursively
-                    ]
-                    print(f"✓ Configured to download folder: {folder_path}")
-                else:
-                    # Download everything (root level)
-                    patterns = ["*"]
-                    print("✓ Configured to download entire repository")
+            except subprocess.CalledProcessError as e:
+                print(f"\nGit command failed:")
+                print(f"Command: {' '.join(e.cmd)}")
+                if e.stderr:
+                    print(f"Error: {e.stderr}")
+                if e.stdout:
+                    print(f"Output: {e.stdout}")
+                return False
                 
-                with open(sparse_file, 'w') as f:
-                    for pattern in patterns:
-                        f.write(f"{pattern}\n")
+            except FileNotFoundError as e:
+                print(f"\n{e}")
+                return False
                 
-                print(f"✓ Sparse-checkout patterns written to: {sparse_file}")
+            except Exception as e:
+                print(f"\nUnexpected error: {e}")
+                return False
+    
+    def download_with_cache(self):
+        """
+        Download through a persistent bare mirror of the repository
+        
+        The mirror lives in $XDG_CACHE_HOME/ghfd (~/.cache/ghfd by default)
+        as a blobless bare clone. Every download only fetches the requested
+        reference into a private ref, then checks it out in a temporary
+        sparse worktree; file contents are fetched lazily for the paths that
+        are actually checked out. The worktree is removed afterwards, the
+        mirror is kept.
+        """
+        owner, repo, git_ref, ref_type, folder_path, _ = self.parse_github_url()
+        clone_url = self.get_clone_url(owner, repo)
+        cache_root = Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")).expanduser() / "ghfd"
+        cache_dir = cache_root / f"{owner}_{repo}.git"
+        
+        print(f"Repository: {owner}/{repo}")
+        print(f"Git reference: {git_ref} ({ref_type})")
+        print(f"Target folder: {folder_path if folder_path else '(entire repository)'}")
+        print(f"Cache: {cache_dir}")
+        print()
+        
+        # Unique per download: names both the fetched ref and the worktree,
+        # whose admin directory in the mirror is named after its basename
+        token = uuid.uuid4().hex
+        
+        with tempfile.TemporaryDirectory(prefix=".ghfd-", dir=self.output_dir) as temp_dir:
+            worktree_path = Path(temp_dir) / f"{repo}-{token}"
+            
+            try:
+                if not cache_dir.exists():
+                    print("Creating cached repository (without blobs)...")
+                    cache_root.mkdir(parents=True, exist_ok=True)
+                    # Clone beside the cache and rename it into place, so a
+                    # concurrent download of the same repository never sees
+                    # a half-written mirror; the loser of the race drops its copy
+                    staging_dir = Path(tempfile.mkdtemp(prefix=f".{owner}_{repo}-", dir=cache_root))
+                    try:
+                        mirror_dir = str(staging_dir / "mirror.git")
+                        subprocess.run([
+                            "git", "clone", "--bare", "--filter=blob:none",
+                            clone_url, mirror_dir
+                        ], **_RUN_KWARGS)
+                        # Per-worktree config up front: otherwise the first
+                        # sparse-checkout in a worktree rewrites the shared
+                        # config, racing with concurrent downloads
+                        for config_args in (["extensions.worktreeConfig", "true"],
+                                            ["--worktree", "core.bare", "true"],
+                                            ["--unset", "core.bare"]):
+                            subprocess.run(["git", "-C", mirror_dir, "config", *config_args],
+                                           **_RUN_KWARGS)
+                        try:
+                            os.rename(mirror_dir, cache_dir)
+                        except OSError:
+                            if not cache_dir.exists():
+                                raise
+                    finally:
+                        shutil.rmtree(staging_dir, ignore_errors=True)
+                    print("✓ Repository cached successfully")
                 
-                print(f"\nStep 3: Checking out files at {ref_type} '{git_ref}'...")
-                # Now checkout the files at the specific git reference
+                # Each download fetches into its own ref: the shared FETCH_HEAD
+                # could be overwritten by a concurrent fetch of another ref
+                revision = f"refs/ghfd/{token}"
+                print(f"Step 1: Fetching {git_ref} into cache...")
                 subprocess.run([
-                    "git", "-C", str(repo_path), 
-                    "checkout", git_ref
-                ], check=True, capture_output=True, text=True)
-                print(f"✓ Files checked out successfully at {git_ref}")
+                    "git", "-C", str(cache_dir),
+                    "fetch", "--no-write-fetch-head", "--filter=blob:none",
+                    "origin", f"+{git_ref}:{revision}"
+                ], **_RUN_KWARGS)
+                print(f"✓ Fetched {git_ref}")
                 
-                print("\nStep 4: Copying to destination...")
-                # Determine source and target paths
-                if folder_path:
-                    source_folder = repo_path / folder_path
-                    if not source_folder.exists():
-                        raise FileNotFoundError(f"Folder '{folder_path}' not found in {ref_type} '{git_ref}'")
-                    
-                    folder_name = Path(folder_path).name
-                    # Include git reference in folder name for clarity
-                    if ref_type == "commit":
-                        target_name = f"{folder_name}_{git_ref[:8]}"
-                    elif ref_type == "tag":
-                        target_name = f"{folder_name}_{git_ref.replace('/', '_')}"
-                    else:
-                        target_name = f"{folder_name}_{git_ref}" if git_ref != "main" else folder_name
-                    
-                    target_path = self.output_dir / target_name
-                    
-                    print(f"Source: {source_folder}")
-                    print(f"Target: {target_path}")
-                    
-                    # Remove existing target directory if it exists
-                    if target_path.exists():
-                        print(f"Removing existing directory: {target_path}")
-                        shutil.rmtree(target_path)
-                    
-                    # Copy the folder
-                    shutil.copytree(source_folder, target_path)
-                    
-                else:
-                    # Copy entire repository (excluding .git)
-                    if ref_type == "commit":
-                        folder_name = f"{repo}_{git_ref[:8]}"
-                    elif ref_type == "tag":
-                        folder_name = f"{repo}_{git_ref.replace('/', '_')}"
-                    else:
-                        folder_name = f"{repo}_{git_ref}" if git_ref != "main" else repo
-                    
-                    target_path = self.output_dir / folder_name
-                    
-                    print(f"Source: {repo_path} (excluding .git)")
-                    print(f"Target: {target_path}")
+                try:
+                    # The worktree is created empty so that sparse-checkout is
+                    # in place before any file is written. git reads every
+                    # other worktree's admin dir while adding one, so
+                    # concurrent downloads must not add or remove at once
+                    with mirror_lock(cache_dir):
+                        subprocess.run([
+                            "git", "-C", str(cache_dir),
+                            "worktree", "add", "--no-checkout", "--detach",
+                            str(worktree_path), revision
+                        ], **_RUN_KWARGS)
                     
-                    # Remove existing target directory if it exists
-                    if target_path.exists():
-                        print(f"Removing existing directory: {target_path}")
-                        shutil.rmtree(target_path)
+                    print("\nStep 2: Configuring sparse-checkout...")
+                    self.configure_sparse_checkout(worktree_path, folder_path)
                     
-                    # Create target directory
-                    target_path.mkdir(parents=True, exist_ok=True)
+                    print(f"\nStep 3: Checking out files at {ref_type} '{git_ref}'...")
+                    # HEAD already points at the revision, only the empty
+                    # index and working tree need populating
+                    subprocess.run([
+                        "git", "-C", str(worktree_path),
+                        "reset", "--hard", "--quiet"
+                    ], **_RUN_KWARGS)
+                    print(f"✓ Files checked out successfully at {git_ref}")
                     
-                    # Copy everything except .git directory
-                    for item in repo_path.iterdir():
-                        if item.name != '.git':
-                            if item.is_dir():
-                                shutil.copytree(item, target_path / item.name)
-                            else:
-                                shutil.copy2(item, target_path / item.name)
+                    print("\nStep 4: Moving to destination...")
+                    target_path = self.install_checkout(worktree_path, repo, git_ref, ref_type, folder_path)
+                finally:
+                    with mirror_lock(cache_dir):
+                        subprocess.run([
+                            "git", "-C", str(cache_dir),
+                            "worktree", "remove", "--force", str(worktree_path)
+                        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                        subprocess.run([
+                            "git", "-C", str(cache_dir),
+                            "update-ref", "-d", revision
+                        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
                 
-                print(f"✓ Successfully copied to: {target_path}")
+                print(f"✓ Successfully moved to: {target_path}")
                 
                 # Show some stats
-                total_files = sum(1 for _ in target_path.rglob('*') if _.is_file())
-                total_dirs = sum(1 for _ in target_path.rglob('*') if _.is_dir())
-                
-                print(f"\nDownload completed!")
-                print(f"Directories: {total_dirs}")
-                print(f"Files: {total_files}")
-                print(f"Location: {target_path.absolute()}")
-                print(f"Git reference: {git_ref} ({ref_type})")
+                self.show_stats(target_path, git_ref, ref_type)
                 
                 return True
                 
@@ -268,38 +851,234 @@ class GitHubFolderDownloader:
                 print(f"\nUnexpected error: {e}")
                 return False
     
+    def pick_strategy(self):
+        """
+        Choose a download strategy from the size of the repository archive
+        
+        A HEAD request on the codeload tarball gives its Content-Length;
+        small folders are fetched file by file, medium repositories as a
+        tarball, large ones and commit SHAs through a sparse clone. Without
+        a usable size the tarball is assumed.
+        """
+        owner, repo, git_ref, ref_type, folder_path, _ = self.parse_github_url()
+        
+        if self.use_cache:
+            print(f"Strategy: {CACHED} (--cache)")
+            return CACHED
+        if ref_type == "commit":
+            print(f"Strategy: {SPARSE} (commit SHA)")
+            return SPARSE
+        
+        archive_url = f"https://codeload.github.com/{owner}/{repo}/tar.gz/{git_ref}"
+        try:
+            request = urllib.request.Request(archive_url, method="HEAD")
+            with urllib.request.urlopen(request, timeout=10) as resp:
+                size = int(resp.headers.get("Content-Length"))
+        except (urllib.error.URLError, OSError, TypeError, ValueError):
+            print(f"Strategy: {TARBALL} (archive size unknown)")
+            return TARBALL
+        
+        strategy = SPARSE
+        for candidate, limit in _STRATEGY_THRESHOLDS.items():
+            # Listing files needs a folder, whole repositories start at tarball
+            if candidate == RAW and not folder_path:
+                continue
+            if size < limit:
+                strategy = candidate
+                break
+        
+        print(f"Strategy: {strategy} (archive size: {size / 1024 / 1024:.1f} MiB)")
+        return strategy
+    
     def download(self):
         """Main download method"""
-        if not self.check_git_available():
-            return False
+        _, _, _, _, folder_path, url_type = self.parse_github_url()
         
         # Create output directory
         self.output_dir.mkdir(parents=True, exist_ok=True)
         print(f"Output directory: {self.output_dir.absolute()}\n")
         
+        # Single files skip git and archives entirely
+        if url_type == "blob" and folder_path:
+            return self.download_raw()
+        
+        strategy = self.pick_strategy()
+        print()
+        
+        # A persistent mirror only pays off through git, skip the archives
+        if strategy == CACHED:
+            if not self.check_git_available():
+                return False
+            return self.download_with_cache()
+        
+        # Over SSH the archive can be streamed by git itself
+        if self.protocol == "ssh" and self.check_git_available():
+            if self.download_with_pipe():
+                return True
+            print(f"\nFalling back to {strategy} download...\n")
+        
+        # Small folders are cheapest as individual files over HTTP/2
+        if strategy == RAW and self.download_with_api():
+            return True
+        
+        # Moderately sized repositories are served as a tarball
+        if strategy in (RAW, TARBALL):
+            if self.download_with_archive():
+                return True
+            print("\nFalling back to git sparse-checkout...\n")
+        
+        if not self.check_git_available():
+            return False
+        
         return self.download_with_sparse_checkout()
 
+class PrefixedOutput:
+    """
+    Stdout wrapper that tags every line with the download that printed it
+    
+    Each batch thread sets its own prefix; lines are written whole so that
+    output from concurrent downloads doesn't interleave mid-line.
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+        self.lock = threading.Lock()
+    
+    def set_prefix(self, prefix):
+        self.local.prefix = prefix
+        self.local.pending = ""
+    
+    def write(self, text):
+        prefix = getattr(self.local, "prefix", None)
+        if prefix is None:
+            return self.stream.write(text)
+        
+        self.local.pending += text
+        *lines, self.local.pending = self.local.pending.split("\n")
+        with self.lock:
+            for line in lines:
+                # Blank spacer lines only make interleaved output harder to read
+                if line.strip():
+                    self.stream.write(f"{prefix} {line}\n")
+        return len(text)
+    
+    def flush(self):
+        self.stream.flush()
+
+async def download_batch(urls, output_dir, protocol, use_cache, jobs):
+    """Download several URLs concurrently, at most `jobs` at a time"""
+    semaphore = asyncio.Semaphore(jobs)
+    loop = asyncio.get_running_loop()
+    output = PrefixedOutput(sys.stdout)
+    
+    def run_in_thread(url):
+        # Daemon threads rather than an executor: on Ctrl-C asyncio.run
+        # would otherwise wait for every in-flight download to finish
+        future = loop.create_future()
+        
+        def resolve(setter, value):
+            if not future.done():
+                setter(value)
+        
+        def runner():
+            output.set_prefix(f"[{urlparse(url).path.strip('/')}]")
+            try:
+                downloader = GitHubFolderDownloader(url, output_dir, protocol, use_cache)
+                result, setter = downloader.download(), future.set_result
+            except Exception as e:
+                result, setter = e, future.set_exception
+            try:
+                loop.call_soon_threadsafe(resolve, setter, result)
+            except RuntimeError:
+                pass  # The loop is already closed after an interrupt
+        
+        threading.Thread(target=runner, daemon=True).start()
+        return future
+    
+    async def download_one(url):
+        async with semaphore:
+            # Downloads are network bound, so threads overlap them fine
+            return await run_in_thread(url)
+    
+    sys.stdout = output
+    try:
+        results = await asyncio.gather(*(download_one(url) for url in urls),
+                                       return_exceptions=True)
+    finally:
+        sys.stdout = output.stream
+    
+    failed = [url for url, result in zip(urls, results) if result is not True]
+    print(f"\nBatch completed: {len(urls) - len(failed)}/{len(urls)} succeeded")
+    for url, result in zip(urls, results):
+        if isinstance(result, Exception):
+            print(f"Failed: {url} ({result})")
+        elif not result:
+            print(f"Failed: {url}")
+    
+    return not failed
+
+def is_github_url(arg):
+    """Tell a GitHub URL from a local path that merely contains 'github.com'"""
+    parsed = urlparse(arg)
+    return parsed.scheme in ('http', 'https') and parsed.netloc.lower() in ('github.com', 'www.github.com')
+
 def main():
     parser = argparse.ArgumentParser(
-        description="Download GitHub repository folders using git sparse-checkout",
+        description="Download GitHub repository folders without cloning whole repositories",
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     
-    parser.add_argument('url', help='GitHub repository or folder URL')
-    parser.add_argument('output', nargs='?', default='~/Downloads',
+    parser.add_argument('paths', nargs='*', metavar='url',
+                       help='GitHub repository or folder URL(s), optionally followed '
+                            'by the output directory')
+    parser.add_argument('-o', '--output', metavar='DIR',
                        help='Output directory (default: ~/Downloads)')
+    parser.add_argument('--urls-file', metavar='FILE',
+                       help='Read additional URLs from FILE, one per line')
+    parser.add_argument('-j', '--jobs', type=int, default=8,
+                       help='Maximum concurrent downloads in batch mode (default: 8)')
+    parser.add_argument('--cache', action='store_true',
+                       help='Keep a bare mirror of each repository in ~/.cache/ghfd '
+                            'and reuse it for later downloads')
+    parser.add_argument('--protocol', choices=['https', 'ssh'], default='https',
+                       help='Transport for git clones and fetches (default: https); '
+                            'ssh also first tries git archive --remote, which '
+                            'github.com currently refuses')
+    
+    # Intermixed so options may appear between URLs, e.g. `url1 -j 4 url2`
+    args = parser.parse_intermixed_args()
+    
+    urls = list(args.paths)
+    output = args.output
+    # A trailing non-URL argument is the output directory, kept for
+    # compatibility with the original `<url> [output_folder]` form
+    if not output and urls and not is_github_url(urls[-1]) and (len(urls) > 1 or args.urls_file):
+        output = urls.pop()
+    output = output or '~/Downloads'
+    
+    if args.urls_file:
+        with open(args.urls_file) as f:
+            urls.extend(line.strip() for line in f
+                        if line.strip() and not line.startswith('#'))
     
-    args = parser.parse_args()
+    if not urls:
+        parser.error("at least one GitHub URL is required")
     
     # Validate URL
-    if 'github.com' not in args.url:
-        print("Error: Please provide a valid GitHub URL")
+    invalid = [url for url in urls if not is_github_url(url)]
+    if invalid:
+        print(f"Error: Please provide a valid GitHub URL ({invalid[0]})")
         sys.exit(1)
     
     try:
-        # Create downloader and start download
-        downloader = GitHubFolderDownloader(args.url, args.output)
-        success = downloader.download()
+        if len(urls) > 1:
+            jobs = max(1, min(len(urls), args.jobs))
+            success = asyncio.run(download_batch(urls, output, args.protocol,
+                                                 args.cache, jobs))
+        else:
+            # Create downloader and start download
+            downloader = GitHubFolderDownloader(urls[0], output, args.protocol, args.cache)
+            success = downloader.download()
         
         sys.exit(0 if success else 1)
         